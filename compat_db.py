@@ -4,65 +4,73 @@ PLATFORMS = {"linux", "macos", "alpine"}
 
 FLAG_COMPAT = {
     "sed": {
-        "-i": {"linux", "alpine"},
-        "-r": {"linux", "alpine"},
-        "-E": {"linux", "macos", "alpine"},
+        "-i": frozenset({"linux", "alpine"}),
+        "-r": frozenset({"linux", "alpine"}),
+        "-E": frozenset({"linux", "macos", "alpine"}),
     },
     "grep": {
-        "-P": {"linux"},
-        "-E": {"linux", "macos", "alpine"},
-        "-o": {"linux", "macos", "alpine"},
-        "-r": {"linux", "macos"},
-        "-R": {"linux", "macos", "alpine"},
-        "-w": {"linux", "macos", "alpine"},
+        "-P": frozenset({"linux"}),
+        "-E": frozenset({"linux", "macos", "alpine"}),
+        "-o": frozenset({"linux", "macos", "alpine"}),
+        "-r": frozenset({"linux", "macos"}),
+        "-R": frozenset({"linux", "macos", "alpine"}),
+        "-w": frozenset({"linux", "macos", "alpine"}),
     },
     "readlink": {
-        "-f": {"linux", "alpine"},
-        "-e": {"linux", "alpine"},
+        "-f": frozenset({"linux", "alpine"}),
+        "-e": frozenset({"linux", "alpine"}),
     },
     "date": {
-        "-d": {"linux", "alpine"},
-        "-j": {"macos"},
-        "-I": {"linux", "alpine"},
+        "-d": frozenset({"linux", "alpine"}),
+        "-j": frozenset({"macos"}),
+        "-I": frozenset({"linux", "alpine"}),
     },
     "mktemp": {
-        "-d": {"linux", "macos", "alpine"},
-        "--tmpdir": {"linux", "alpine"},
+        "-d": frozenset({"linux", "macos", "alpine"}),
+        "--tmpdir": frozenset({"linux", "alpine"}),
     },
     "stat": {
-        "-c": {"linux", "alpine"},
-        "-f": {"macos"},
+        "-c": frozenset({"linux", "alpine"}),
+        "-f": frozenset({"macos"}),
     },
     "find": {
-        "-regextype": {"linux", "alpine"},
-        "-maxdepth": {"linux", "macos", "alpine"},
-        "-print0": {"linux", "macos", "alpine"},
+        "-regextype": frozenset({"linux", "alpine"}),
+        "-maxdepth": frozenset({"linux", "macos", "alpine"}),
+        "-print0": frozenset({"linux", "macos", "alpine"}),
     },
     "sort": {
-        "-V": {"linux", "alpine"},
-        "-h": {"linux", "alpine"},
-        "-R": {"linux"},
+        "-V": frozenset({"linux", "alpine"}),
+        "-h": frozenset({"linux", "alpine"}),
+        "-R": frozenset({"linux"}),
     },
     "tar": {
-        "--wildcards": {"linux", "alpine"},
-        "--exclude": {"linux", "macos", "alpine"},
+        "--wildcards": frozenset({"linux", "alpine"}),
+        "--exclude": frozenset({"linux", "macos", "alpine"}),
     },
     "xargs": {
-        "-r": {"linux", "alpine"},
-        "-0": {"linux", "macos", "alpine"},
+        "-r": frozenset({"linux", "alpine"}),
+        "-0": frozenset({"linux", "macos", "alpine"}),
     },
     "cp": {
-        "--reflink": {"linux"},
-        "-a": {"linux", "macos", "alpine"},
+        "--reflink": frozenset({"linux"}),
+        "-a": frozenset({"linux", "macos", "alpine"}),
     },
     "ln": {
-        "-r": {"linux", "alpine"},
+        "-r": frozenset({"linux", "alpine"}),
     },
     "install": {
-        "-D": {"linux", "alpine"},
+        "-D": frozenset({"linux", "alpine"}),
     },
 }
 
+# Flattened view of FLAG_COMPAT: one dict probe per (cmd, flag) instead of
+# a command lookup followed by a flag lookup.
+FLAG_SUPPORTED = {
+    (cmd, flag): platforms
+    for cmd, flags in FLAG_COMPAT.items()
+    for flag, platforms in flags.items()
+}
+
 FIXES = {
     ("sed", "-i"): "sed -i.bak 's/.../' f && rm f.bak  (portable across GNU & BSD)",
     ("sed", "-r"): "Use sed -E instead (portable extended regex)",
@@ -1,113 +1,501 @@
 #!/usr/bin/env python3
 """ShellPort - Cross-platform shell command compatibility analyzer."""
 import argparse
+import io
 import json
 import os
+import pickle
 import re
+import sqlite3
 import sys
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-from compat_db import FLAG_COMPAT, FIXES, PLATFORMS
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from compat_db import FLAG_COMPAT, FLAG_SUPPORTED, FIXES, PLATFORMS
 
 SCAN_EXTS = {".sh", ".bash", ".zsh", ".yml", ".yaml", ".mk"}
 SCAN_NAMES = {"Makefile", "Justfile", "Dockerfile"}
 
+# Files above this size are assumed generated and skipped entirely.
+MAX_SCAN_BYTES = 2 * 1024 * 1024
+
+RUN_LINE_RE = re.compile(r"run\s*:\s*(.*)$")
+YAML_KEY_RE = re.compile(r"^\w[\w-]*:")
+
+# Maps the statement separators |;& to a single sentinel so splitting a
+# command line is one C-level translate + split instead of a regex pass.
+_SEP_TRANS = str.maketrans("|;&", "\x00\x00\x00")
+
+# Tracked command names interned once: downstream dict probes compare by
+# identity instead of hashing a fresh basename string per token.
+_INTERNED_CMDS = {c: sys.intern(c) for c in FLAG_COMPAT}
+
+# Cheap prefilter: most lines mention no tracked command at all, so reject
+# them with a single multi-pattern substring scan before tokenizing. The
+# same matcher feeds scan_text with (start, end, cmd) hit positions.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+if ahocorasick is not None:
+    _CMD_AC = ahocorasick.Automaton()
+    for _cmd in FLAG_COMPAT:
+        _CMD_AC.add_word(_cmd, _cmd)
+    _CMD_AC.make_automaton()
+
+    def _has_candidate(line):
+        for _ in _CMD_AC.iter(line):
+            return True
+        return False
+
+    def _iter_cmd_hits(text):
+        for end, cmd in _CMD_AC.iter(text):
+            yield end - len(cmd) + 1, end + 1, cmd
+else:
+    _CMD_RE = re.compile("|".join(sorted(FLAG_COMPAT, key=len, reverse=True)))
+
+    def _has_candidate(line):
+        return _CMD_RE.search(line) is not None
+
+    def _iter_cmd_hits(text):
+        for m in _CMD_RE.finditer(text):
+            yield m.start(), m.end(), _INTERNED_CMDS[m.group()]
+
+
+# Optional fast path for the fused scanner: Hyperscan compiles the command
+# names into one DFA scanned in C. Match offsets are bytes, so it is only
+# used on ASCII text where they coincide with str indexes.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+if hyperscan is not None:
+    _HS_CMDS = [sys.intern(c) for c in FLAG_COMPAT]
+    _HS_DB = hyperscan.Database()
+    _HS_DB.compile(
+        expressions=[c.encode() for c in _HS_CMDS],
+        ids=list(range(len(_HS_CMDS))),
+        elements=len(_HS_CMDS),
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(_HS_CMDS),
+    )
+
+    def _hyperscan_hits(text):
+        hits = []
+
+        def on_match(pat_id, start, end, flags, context):
+            hits.append((start, end, _HS_CMDS[pat_id]))
+
+        _HS_DB.scan(text.encode(), match_event_handler=on_match)
+        hits.sort()
+        return hits
+else:
+    _HS_DB = None
+
 
 def extract_commands(line):
     """Extract (command, [flags]) tuples from a shell command line."""
-    line = re.sub(r"#.*$", "", line).strip()
+    i = line.find("#")
+    line = (line if i < 0 else line[:i]).strip()
     if not line:
         return []
     results = []
-    for part in re.split(r"[|;&]+", line):
+    for part in line.translate(_SEP_TRANS).split("\x00"):
         tokens = part.split()
         if not tokens:
             continue
-        cmd = os.path.basename(tokens[0])
-        flags = [t for t in tokens[1:] if t.startswith("-")]
-        if cmd in FLAG_COMPAT:
-            results.append((cmd, flags))
+        tok0 = tokens[0]
+        i = tok0.rfind("/")
+        cmd = _INTERNED_CMDS.get(tok0 if i < 0 else tok0[i + 1:])
+        if cmd is None:
+            continue
+        flags = [t for t in tokens[1:] if t and t[0] == "-"]
+        results.append((cmd, flags))
     return results
 
 
-def parse_file(filepath):
-    """Yield (line_number, shell_line) from supported file types."""
+def scan_text(text):
+    """Yield (lineno, cmd, flags) from raw shell text in a single pass.
+
+    Fuses line splitting, comment stripping, statement splitting and
+    tokenization: the command matcher locates candidate hits in the whole
+    text, and only those positions are inspected for statement context
+    and trailing flags. Equivalent to running extract_commands per line.
+    """
+    n = len(text)
+    lineno = 1
+    last = 0
+    if _HS_DB is not None and text.isascii():
+        hits = _hyperscan_hits(text)
+    else:
+        hits = _iter_cmd_hits(text)
+    for st, en, cmd in hits:
+        # Must be a standalone token, not a prefix of a longer word.
+        if en < n and text[en] not in " \t\n;|&#":
+            continue
+        line_start = text.rfind("\n", 0, st) + 1
+        # Anything after '#' on the line is comment.
+        if text.find("#", line_start, st) != -1:
+            continue
+        # Must be the first token of its statement, modulo a path prefix.
+        j = st
+        if j > line_start and text[j - 1] == "/":
+            j -= 1
+            while j > line_start and text[j - 1] not in " \t;|&":
+                j -= 1
+        while j > line_start and text[j - 1] in " \t":
+            j -= 1
+        if j > line_start and text[j - 1] not in ";|&":
+            continue
+        end = n
+        for ch in ";|&\n#":
+            q = text.find(ch, en)
+            if q != -1 and q < end:
+                end = q
+        lineno += text.count("\n", last, st)
+        last = st
+        yield lineno, cmd, [t for t in text[en:end].split() if t[0] == "-"]
+
+
+def _iter_shell(lines):
+    for i, line in enumerate(lines, 1):
+        yield i, line
+
+
+def _iter_dockerfile(lines):
+    for i, line in enumerate(lines, 1):
+        s = line.strip()
+        if s.upper().startswith("RUN "):
+            yield i, s[4:]
+
+
+def _iter_makefile(lines):
+    for i, line in enumerate(lines, 1):
+        if line.startswith("\t"):
+            yield i, line.strip()
+
+
+def _iter_yaml(lines):
+    in_run = False
+    for i, line in enumerate(lines, 1):
+        s = line.strip()
+        # "- run:" list items carry the same key as plain "run:".
+        key = s[2:].lstrip() if s.startswith("- ") else s
+        m = RUN_LINE_RE.match(key)
+        if m:
+            rest = m.group(1).strip()
+            if rest in ("", "|", "|-", "|+", ">", ">-", ">+"):
+                in_run = True
+            else:
+                in_run = False
+                yield i, rest
+        elif in_run and s and not YAML_KEY_RE.match(key):
+            yield i, s
+        elif YAML_KEY_RE.match(key):
+            in_run = False
+
+
+_EXT_HANDLERS = {
+    ".sh": _iter_shell, ".bash": _iter_shell, ".zsh": _iter_shell,
+    ".yml": _iter_yaml, ".yaml": _iter_yaml, ".mk": _iter_makefile,
+}
+_NAME_HANDLERS = {
+    "Dockerfile": _iter_dockerfile,
+    "Makefile": _iter_makefile,
+    "Justfile": _iter_makefile,
+}
+
+
+def _open_text(filepath, max_bytes=MAX_SCAN_BYTES):
+    """Open a file for scanning, or None for oversized/binary files."""
     try:
-        lines = Path(filepath).read_text(errors="ignore").splitlines()
+        if os.stat(filepath).st_size > max_bytes:
+            return None
+        f = open(filepath, "rb")
     except OSError:
+        return None
+    if b"\x00" in f.read(512):
+        f.close()
+        return None
+    f.seek(0)
+    return io.TextIOWrapper(f, encoding="utf-8", errors="ignore")
+
+
+def parse_file(filepath, max_bytes=MAX_SCAN_BYTES):
+    """Yield (line_number, shell_line) from supported file types."""
+    handler = (_NAME_HANDLERS.get(os.path.basename(filepath))
+               or _EXT_HANDLERS.get(os.path.splitext(filepath)[1]))
+    if handler is None:
         return
-    name = os.path.basename(filepath)
-    ext = Path(filepath).suffix
-    if ext in (".sh", ".bash", ".zsh"):
-        for i, line in enumerate(lines, 1):
-            yield i, line
-    elif name == "Dockerfile":
-        for i, line in enumerate(lines, 1):
-            s = line.strip()
-            if s.upper().startswith("RUN "):
-                yield i, s[4:]
-    elif name in ("Makefile", "Justfile"):
-        for i, line in enumerate(lines, 1):
-            if line.startswith("\t"):
-                yield i, line.strip()
-    elif ext in (".yml", ".yaml"):
-        in_run = False
-        for i, line in enumerate(lines, 1):
-            s = line.strip()
-            if re.match(r"run\s*:\s*\|?\s*$", s):
-                in_run = True
-            elif in_run and s and not re.match(r"^\w[\w-]*:", s):
-                yield i, s
-            elif re.match(r"^\w[\w-]*:", s):
-                in_run = False
+    f = _open_text(filepath, max_bytes)
+    if f is None:
+        return
+    with f:
+        yield from handler(f)
+
+
+# (cmd, flag, targets) -> (supported, unsupported) or None when portable.
+# scan() passes one targets set for the whole run, so every repeated
+# (cmd, flag) after the first resolves to a pair of dict lookups.
+_COMPAT_CACHE = {}
 
 
 def check_compat(cmd, flags, targets):
     """Return findings for incompatible flags."""
     findings = []
-    db = FLAG_COMPAT.get(cmd, {})
+    ftargets = frozenset(targets)
     for flag in flags:
-        if flag in db:
-            supported = db[flag]
-            missing = targets - supported
-            if missing:
-                findings.append({
-                    "command": cmd, "flag": flag,
-                    "supported": sorted(supported & targets),
-                    "unsupported": sorted(missing),
-                    "fix": FIXES.get((cmd, flag), "Check POSIX spec for portable alternative"),
-                })
+        supported = FLAG_SUPPORTED.get((cmd, flag))
+        if supported is None:
+            continue
+        key = (cmd, flag, ftargets)
+        try:
+            cached = _COMPAT_CACHE[key]
+        except KeyError:
+            missing = ftargets - supported
+            cached = (sorted(supported & ftargets), sorted(missing)) if missing else None
+            _COMPAT_CACHE[key] = cached
+        if cached is not None:
+            # Fresh lists per finding: callers may mutate them, and the
+            # cached pair must stay pristine for later calls.
+            findings.append({
+                "command": cmd, "flag": flag,
+                "supported": list(cached[0]),
+                "unsupported": list(cached[1]),
+                "fix": FIXES.get((cmd, flag), "Check POSIX spec for portable alternative"),
+            })
     return findings
 
 
-def scan(root, targets):
-    """Scan a directory tree and return all compatibility findings."""
-    results = []
-    for path in sorted(Path(root).rglob("*")):
-        if not path.is_file() or ".git" in path.parts:
+def find_files(root):
+    """Collect scannable file paths under root, pruning .git subtrees."""
+    paths = []
+
+    def walk(dirpath):
+        try:
+            entries = os.scandir(dirpath)
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != ".git":
+                        walk(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    if (entry.name in SCAN_NAMES
+                            or os.path.splitext(entry.name)[1] in SCAN_EXTS):
+                        paths.append(entry.path)
+
+    walk(root)
+    paths.sort()
+    return paths
+
+
+# Below this many files a worker pool costs more to start than it saves.
+_PARALLEL_THRESHOLD = 64
+
+
+def _extract_file(path, max_bytes=MAX_SCAN_BYTES):
+    """Yield (lineno, cmd, flags) for every tracked command in a file.
+
+    Shell scripts are whole-file shell text, so they take the fused
+    scan_text pass; the context-gated types (Dockerfile, Makefile, YAML)
+    go through parse_file to keep non-recipe lines out of the results.
+    """
+    if os.path.splitext(path)[1] in (".sh", ".bash", ".zsh"):
+        f = _open_text(path, max_bytes)
+        if f is None:
+            return
+        with f:
+            text = f.read()
+        yield from scan_text(text)
+        return
+    for lineno, line in parse_file(path, max_bytes):
+        if not _has_candidate(line):
             continue
-        if path.suffix in SCAN_EXTS or path.name in SCAN_NAMES:
-            for lineno, line in parse_file(str(path)):
-                for cmd, flags in extract_commands(line):
-                    for f in check_compat(cmd, flags, targets):
-                        f.update(file=str(path.relative_to(root)), line=lineno)
-                        results.append(f)
-    return results
+        for cmd, flags in extract_commands(line):
+            yield lineno, cmd, flags
+
+
+_SPECIALIZED = {}
+
+
+def _specialize(targets):
+    """Generate per-command flag checkers with targets folded into literals.
+
+    targets is fixed for a whole scan run, so the set arithmetic in
+    check_compat can be evaluated once per (cmd, flag) here and compiled
+    into straight-line membership tests over finding literals. Portable
+    flags generate no code at all.
+    """
+    checkers = _SPECIALIZED.get(targets)
+    if checkers is not None:
+        return checkers
+    checkers = {}
+    for cmd, flags in FLAG_COMPAT.items():
+        lines = ["def _check(flags):", "    findings = []"]
+        for flag, supported in flags.items():
+            missing = targets - supported
+            if not missing:
+                continue
+            finding = {
+                "command": cmd, "flag": flag,
+                "supported": sorted(supported & targets),
+                "unsupported": sorted(missing),
+                "fix": FIXES.get((cmd, flag), "Check POSIX spec for portable alternative"),
+            }
+            lines.append(f"    if {flag!r} in flags:")
+            lines.append(f"        findings.append({finding!r})")
+        lines.append("    return findings")
+        ns = {}
+        exec("\n".join(lines), ns)
+        checkers[cmd] = ns["_check"]
+    _SPECIALIZED[targets] = checkers
+    return checkers
+
+
+def _extract_entries(path, max_bytes=MAX_SCAN_BYTES):
+    """Materialize _extract_file for one path (picklable pool worker)."""
+    return list(_extract_file(path, max_bytes))
+
+
+def _extract_all(paths, max_bytes=MAX_SCAN_BYTES):
+    """Yield extracted entries per path, in parallel for large batches."""
+    worker = partial(_extract_entries, max_bytes=max_bytes)
+    if len(paths) < _PARALLEL_THRESHOLD:
+        yield from map(worker, paths)
+    else:
+        with ProcessPoolExecutor() as ex:
+            yield from ex.map(worker, paths, chunksize=32)
+
+
+class _ParseCache:
+    """Persistent per-file extraction cache keyed on (path, mtime, size).
+
+    Findings are recomputed each run (targets may change); only the
+    parse + extract step, which dominates scan time, is cached. A hit
+    against a corrupt payload reads as a miss, and a cache that cannot
+    be written is dropped silently: the cache trades performance, never
+    correctness.
+    """
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, payload BLOB)"
+        )
+        self._pending = []
+
+    def get(self, path, st):
+        try:
+            row = self._conn.execute(
+                "SELECT payload FROM files WHERE path = ? AND mtime_ns = ? AND size = ?",
+                (path, st.st_mtime_ns, st.st_size),
+            ).fetchone()
+            return pickle.loads(row[0]) if row else None
+        except (sqlite3.Error, pickle.PickleError, EOFError, OSError):
+            return None
+
+    def put(self, path, st, entries):
+        self._pending.append(
+            (path, st.st_mtime_ns, st.st_size, pickle.dumps(entries)))
+
+    def close(self):
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", self._pending)
+            self._conn.close()
+        except (sqlite3.Error, OSError):
+            pass
+
+
+def scan(root, targets, cache=None, max_bytes=MAX_SCAN_BYTES):
+    """Scan a directory tree, yielding compatibility findings.
+
+    Findings are streamed so callers can report as they go; memory stays
+    flat no matter how many a tree produces. With a cache path, per-file
+    extraction results are reused across runs for files whose mtime and
+    size are unchanged.
+    """
+    paths = find_files(root)
+    targets = frozenset(targets)
+    per_file = {}
+    store = None
+    if cache:
+        try:
+            store = _ParseCache(cache)
+        except (sqlite3.Error, OSError):
+            # Unopenable cache (read-only CWD, bad path): scan uncached.
+            store = None
+    misses = paths
+    stats = {}
+    if store is not None:
+        misses = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            key = os.path.abspath(path)
+            entries = store.get(key, st)
+            if entries is None:
+                stats[path] = (key, st)
+                misses.append(path)
+            else:
+                per_file[path] = entries
+    for path, entries in zip(misses, _extract_all(misses, max_bytes)):
+        per_file[path] = entries
+        if store is not None:
+            key, st = stats[path]
+            store.put(key, st, entries)
+    if store is not None:
+        store.close()
+    checkers = _specialize(targets)
+    for path in paths:
+        entries = per_file.get(path)
+        if not entries:
+            continue
+        rel = os.path.relpath(path, root)
+        for lineno, cmd, flags in entries:
+            for f in checkers[cmd](flags):
+                f.update(file=rel, line=lineno)
+                yield f
+
+
+def format_json(results, pretty=False):
+    """Serialize results, compact by default for machine consumers."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(results, option=option).decode()
+    if pretty:
+        return json.dumps(results, indent=2)
+    return json.dumps(results, separators=(",", ":"))
+
+
+def format_finding(r):
+    """Format a single finding as human-readable text."""
+    label = "WARNING" if r["supported"] else "ERROR"
+    return (
+        f'{r["file"]}:{r["line"]}  [{label}]  `{r["command"]} {r["flag"]}`'
+        f'  missing on: {", ".join(r["unsupported"])}'
+        f'\n  -> {r["fix"]}'
+    )
 
 
 def format_text(results):
     """Format results as human-readable text."""
+    results = list(results)
     if not results:
         return "No portability issues found."
-    out = []
-    for r in results:
-        label = "WARNING" if r["supported"] else "ERROR"
-        out.append(
-            f'{r["file"]}:{r["line"]}  [{label}]  `{r["command"]} {r["flag"]}`'
-            f'  missing on: {", ".join(r["unsupported"])}'
-        )
-        out.append(f'  -> {r["fix"]}')
-    return "\n".join(out)
+    return "\n".join(format_finding(r) for r in results)
 
 
 def main():
@@ -116,14 +504,40 @@ def main():
     p.add_argument("path", nargs="?", default=".")
     p.add_argument("--target", default="linux,macos,alpine")
     p.add_argument("--format", choices=["text", "json"], default="text", dest="fmt")
+    p.add_argument("--pretty", action="store_true", help="indent JSON output")
+    p.add_argument("--cache", default=".shellport_cache.sqlite",
+                   help="parse-cache path for incremental re-scans")
+    p.add_argument("--no-cache", action="store_true", help="disable the parse cache")
+    p.add_argument("--max-bytes", type=int, default=MAX_SCAN_BYTES,
+                   help="skip files larger than this many bytes")
     args = p.parse_args()
     targets = set(args.target.split(","))
     invalid = targets - PLATFORMS
     if invalid:
         sys.exit(f"Unknown platforms: {invalid}. Valid: {sorted(PLATFORMS)}")
-    results = scan(args.path, targets)
-    print(json.dumps(results, indent=2) if args.fmt == "json" else format_text(results))
-    sys.exit(1 if results else 0)
+    findings = scan(args.path, targets, cache=None if args.no_cache else args.cache,
+                    max_bytes=args.max_bytes)
+    out = sys.stdout
+    had_any = False
+    if args.fmt == "json" and args.pretty:
+        results = list(findings)
+        had_any = bool(results)
+        print(format_json(results, pretty=True))
+    elif args.fmt == "json":
+        out.write("[")
+        for f in findings:
+            if had_any:
+                out.write(",")
+            out.write(format_json(f))
+            had_any = True
+        out.write("]\n")
+    else:
+        for f in findings:
+            had_any = True
+            out.write(format_finding(f) + "\n")
+        if not had_any:
+            out.write("No portability issues found.\n")
+    sys.exit(1 if had_any else 0)
 
 
 if __name__ == "__main__":
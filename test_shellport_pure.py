@@ -0,0 +1,158 @@
+"""Tests for ShellPort that touch no filesystem.
+
+Kept separate from the scan tests so xdist (--dist=loadfile) can run
+this module on its own worker while the FS-bound tests overlap.
+"""
+import functools
+
+import pytest
+
+from shellport import extract_commands, check_compat, scan_text
+
+_PLATS_LM = frozenset({"linux", "macos"})
+_PLATS_LMA = frozenset({"linux", "macos", "alpine"})
+
+
+@pytest.fixture(scope="session")
+def compat_cache():
+    """check_compat memoized over hashable args, shared across the matrix
+    tests so repeated (cmd, flag, platforms) rows hit the cache."""
+    return functools.lru_cache(maxsize=None)(
+        lambda cmd, flags, platforms: check_compat(cmd, list(flags), set(platforms))
+    )
+
+
+def test_extract_sed_flag():
+    result = extract_commands("sed -i 's/foo/bar/' file.txt")
+    assert result == [("sed", ["-i"])]
+
+
+def test_extract_piped_commands():
+    result = extract_commands("cat file | grep -P 'pattern' | sort -V")
+    found = {(c, tuple(fs)) for c, fs in result}
+    assert len(result) == 2
+    assert ("grep", ("-P",)) in found
+    assert ("sort", ("-V",)) in found
+
+
+@pytest.mark.parametrize("src", ["", "   ", "\t", "\n", "# grep -P foo"])
+def test_extract_returns_empty(src):
+    assert extract_commands(src) == []
+
+
+def test_extract_chained_commands():
+    result = extract_commands("readlink -f /tmp && date -d '1 day'")
+    found = {(c, tuple(fs)) for c, fs in result}
+    assert len(result) == 2
+    assert ("readlink", ("-f",)) in found
+    assert ("date", ("-d",)) in found
+
+
+def test_scan_text_matches_per_line_extraction():
+    text = (
+        "#!/bin/bash\n"
+        "grep -P 'foo' bar  # trailing comment\n"
+        "echo grep -P not-a-command-position\n"
+        "/usr/bin/sed -i 's/a/b/' f && sort -V list\n"
+    )
+    expected = [
+        (lineno, cmd, flags)
+        for lineno, line in enumerate(text.splitlines(), 1)
+        for cmd, flags in extract_commands(line)
+    ]
+    assert list(scan_text(text)) == expected
+    assert (4, "sed", ["-i"]) in expected
+
+
+def test_extract_adjacent_separators():
+    result = extract_commands("grep -P a && sed -i b ;; sort -V c")
+    found = {(c, tuple(fs)) for c, fs in result}
+    assert len(result) == 3
+    assert ("grep", ("-P",)) in found
+    assert ("sed", ("-i",)) in found
+    assert ("sort", ("-V",)) in found
+
+
+def test_extract_semicolon_chained():
+    result = extract_commands("grep -P 'foo' f; sed -i 's/a/b/' f")
+    found = {(c, tuple(fs)) for c, fs in result}
+    assert len(result) == 2
+    assert ("grep", ("-P",)) in found
+    assert ("sed", ("-i",)) in found
+
+
+def test_compat_gnu_only_flag():
+    findings = check_compat("grep", ["-P"], _PLATS_LM)
+    assert len(findings) == 1
+    assert "macos" in findings[0]["unsupported"]
+    assert "linux" in findings[0]["supported"]
+
+
+def test_compat_portable_flag():
+    findings = check_compat("grep", ["-E"], _PLATS_LMA)
+    assert len(findings) == 0
+
+
+def test_compat_bsd_only_flag():
+    findings = check_compat("date", ["-j"], _PLATS_LM)
+    assert len(findings) == 1
+    assert "linux" in findings[0]["unsupported"]
+    assert "macos" in findings[0]["supported"]
+
+
+def test_compat_includes_fix():
+    findings = check_compat("sed", ["-i"], _PLATS_LM)
+    assert len(findings) == 1
+    assert "portable" in findings[0]["fix"].lower() or "bak" in findings[0]["fix"]
+
+
+# ---------------------------------------------------------------------------
+# Parametrized compat-db coverage
+# ---------------------------------------------------------------------------
+
+# flagged_on None means the flag is portable and must produce no finding.
+@pytest.mark.parametrize("cmd,flag,flagged_on", [
+    ("grep", "-P", "macos"),
+    ("sed", "-i", "macos"),
+    ("readlink", "-f", "macos"),
+    ("date", "-d", "macos"),
+    ("date", "-j", "linux"),
+    ("stat", "-c", "macos"),
+    ("grep", "-E", None),
+    ("grep", "-i", None),
+    ("grep", "-v", None),
+    ("sed", "-e", None),
+    ("sort", "-n", None),
+    ("sort", "-r", None),
+])
+def test_compat_matrix(compat_cache, cmd, flag, flagged_on):
+    findings = compat_cache(cmd, (flag,), _PLATS_LMA)
+    if flagged_on is None:
+        assert findings == [], f"{cmd} {flag} should be portable"
+    else:
+        assert any(flagged_on in f["unsupported"] for f in findings), \
+            f"{cmd} {flag} should be flagged on {flagged_on}"
+
+
+# ---------------------------------------------------------------------------
+# Structural guarantees — finding schema, including a non-empty fix
+# ---------------------------------------------------------------------------
+
+_FINDING_KEYS = {"flag", "supported", "unsupported", "fix"}
+
+
+@pytest.mark.parametrize("cmd,flags", [
+    ("grep", ["-P"]),
+    ("sed", ["-i"]),
+    ("readlink", ["-f"]),
+    ("date", ["-d"]),
+    ("date", ["-j"]),
+], ids=["grep-P", "sed-i", "readlink-f", "date-d", "date-j"])
+def test_finding_schema(compat_cache, cmd, flags):
+    """Every finding carries the full dict schema and a fix suggestion."""
+    findings = compat_cache(cmd, tuple(flags), _PLATS_LM)
+    assert findings
+    for f in findings:
+        assert _FINDING_KEYS.issubset(f.keys()), \
+            f"Missing keys for {cmd} {flags}: {_FINDING_KEYS - f.keys()}"
+        assert len(f["fix"]) > 0, f"Empty fix for {cmd} {flags}"
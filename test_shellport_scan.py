@@ -0,0 +1,179 @@
+"""Tests for ShellPort's directory scanning."""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from shellport import scan
+
+_PLATS_LM = frozenset({"linux", "macos"})
+_PLATS_LMA = frozenset({"linux", "macos", "alpine"})
+
+
+# PNG magic followed by NUL padding: enough to trip the binary sniff.
+_PNG_FIXTURE = bytes.fromhex("89504e470d0a1a0a") + bytes(64)
+
+# One sample file per supported type; the shared tree is scanned once per
+# session and the tests filter the result by file.
+_TREE = {
+    "sh/test.sh": "#!/bin/bash\ngrep -P 'foo' bar\nreadlink -f /tmp\n",
+    "sh/clean.sh": "#!/bin/bash\necho hello\nls -la\ngrep -E 'foo' bar\n",
+    "sh/deploy.sh": "#!/bin/bash\nsed -i 's/x/y/' f\ngrep -P pat f\nsort -V list\n",
+    "docker/Dockerfile": "FROM ubuntu\nRUN sed -i 's/a/b/' /etc/foo\nCOPY . .\n",
+    "mk/Makefile": "build:\n\tstat -c '%s' file\n\techo done\n",
+    "yml/ci.yml": "steps:\n  - name: test\n    run: |\n      grep -P 'x' f\n",
+    "yml/inline.yml": (
+        "name: CI\n"
+        "jobs:\n"
+        "  build:\n"
+        "    steps:\n"
+        "      - run: grep -P 'test' file\n"
+    ),
+    "yml/deploy.yaml": (
+        "steps:\n"
+        "  - run: |\n"
+        "      readlink -f /opt\n"
+        "      date -d 'yesterday'\n"
+    ),
+    "scripts/nested.sh": "#!/bin/bash\nreadlink -f /opt\n",
+    "img/image.png": _PNG_FIXTURE,
+}
+
+
+def _write(p, data):
+    """Write fixture content via one raw open/write/close, skipping io layers."""
+    if isinstance(data, str):
+        data = data.encode()
+    fd = os.open(p, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.write(fd, data)
+    os.close(fd)
+
+
+@pytest.fixture(scope="session")
+def scan_root():
+    """Session tmp root, on tmpfs when available so fixtures stay in RAM.
+
+    One root per session (and per xdist worker), removed at session end.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    root = tempfile.mkdtemp(prefix=f"shellport_{worker}_", dir=base)
+    yield root
+    shutil.rmtree(root, ignore_errors=True)
+
+
+@pytest.fixture
+def scan_dir(scan_root, request):
+    """Per-test subdirectory under the session scan root."""
+    d = os.path.join(scan_root, request.node.name)
+    os.mkdir(d)
+    return d
+
+
+@pytest.fixture(scope="session")
+def scanned(scan_root):
+    """Findings from a single scan over the shared fixture tree."""
+    root = os.path.join(scan_root, "shared_tree")
+    for rel, content in _TREE.items():
+        p = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        _write(p, content)
+    return list(scan(root, _PLATS_LMA))
+
+
+def _for_file(scanned, rel):
+    return [r for r in scanned if r["file"] == rel]
+
+
+def test_scan_shell_script(scanned):
+    results = _for_file(scanned, "sh/test.sh")
+    assert len(results) == 2
+    cmds = {r["command"] for r in results}
+    assert cmds == {"grep", "readlink"}
+
+
+def test_scan_dockerfile(scanned):
+    results = _for_file(scanned, "docker/Dockerfile")
+    assert len(results) == 1
+    assert results[0]["command"] == "sed"
+    assert results[0]["flag"] == "-i"
+
+
+def test_scan_makefile(scanned):
+    results = _for_file(scanned, "mk/Makefile")
+    assert len(results) == 1
+    assert results[0]["command"] == "stat"
+
+
+def test_scan_yaml_run_block_pipe(scanned):
+    results = _for_file(scanned, "yml/ci.yml")
+    assert len(results) == 1
+    assert results[0]["command"] == "grep"
+
+
+def test_scan_yaml_run_block_inline(scanned):
+    results = _for_file(scanned, "yml/inline.yml")
+    assert len(results) >= 1
+    assert any(r["command"] == "grep" and r["flag"] == "-P" for r in results)
+
+
+def test_scan_yaml_multiline_run(scanned):
+    cmds = {r["command"] for r in _for_file(scanned, "yml/deploy.yaml")}
+    assert "readlink" in cmds or "date" in cmds
+
+
+def test_scan_clean_repo_no_issues(scanned):
+    assert _for_file(scanned, "sh/clean.sh") == []
+
+
+def test_scan_multiple_issues_in_one_file(scanned):
+    results = _for_file(scanned, "sh/deploy.sh")
+    cmds = {r["command"] for r in results}
+    assert len(results) == 3 and cmds == {"sed", "grep", "sort"}
+
+
+def test_scan_empty_directory(scan_dir):
+    results = list(scan(scan_dir, _PLATS_LM))
+    assert results == []
+
+
+def test_scan_nested_directories(scanned):
+    results = _for_file(scanned, "scripts/nested.sh")
+    assert len(results) >= 1
+    assert results[0]["command"] == "readlink"
+
+
+def test_scan_cache_reuse_and_invalidation(scan_dir):
+    cache = os.path.join(scan_dir, "cache.sqlite")
+    p = os.path.join(scan_dir, "test.sh")
+    _write(p, "#!/bin/bash\ngrep -P 'foo' bar\n")
+    first = list(scan(scan_dir, _PLATS_LM, cache=cache))
+    cached = list(scan(scan_dir, _PLATS_LM, cache=cache))
+    assert cached == first
+    assert len(cached) == 1
+    _write(p, "#!/bin/bash\necho hello\n")
+    assert list(scan(scan_dir, _PLATS_LM, cache=cache)) == []
+
+
+def test_scan_ignores_non_target_files(scanned):
+    """Binary / image files should not produce findings or crashes."""
+    assert _for_file(scanned, "img/image.png") == []
+
+
+_LOCATION_KEYS = {"file", "line"}
+
+
+@pytest.mark.parametrize("rel", [
+    "sh/test.sh",
+    "docker/Dockerfile",
+    "mk/Makefile",
+    "yml/ci.yml",
+], ids=["shell", "dockerfile", "makefile", "yaml"])
+def test_scan_result_has_location(scanned, rel):
+    """Every scan result carries a file path and line number."""
+    results = _for_file(scanned, rel)
+    assert results
+    for r in results:
+        assert _LOCATION_KEYS.issubset(r.keys()), \
+            f"Missing keys: {_LOCATION_KEYS - r.keys()}"